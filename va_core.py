@@ -0,0 +1,194 @@
+"""
+Numerical core of the VA coupling model
+
+Shared by the Streamlit UI; holds the precomputed grids and lookup tables,
+the VACouplingApp model and the memoized heart rate sweep. Free of
+Streamlit so scripts, notebooks and tests can import it directly.
+"""
+import functools
+
+import numpy as np
+
+# Fixed heart rate grid shared by every sweep (read-only)
+_HRS = np.linspace(40.0, 120.0, 81)
+_HRS.setflags(write=False)
+
+def _diastolic_efficiency(hr):
+    """Diastolic efficiency; depends on heart rate only"""
+    return np.exp(-0.5 * ((hr - 75)/30)**2)
+
+def _hr_factor(hr):
+    """Non-linear heart rate effect on wedge pressure; depends on heart rate only"""
+    # Shorter diastolic time may require different filling pressures
+    return 1 - np.exp(-0.1 * (hr - 75))
+
+# HR-only terms on the fixed grid, independent of EF and SVR
+_DIAS_EFF = _diastolic_efficiency(_HRS)
+_DIAS_EFF.setflags(write=False)
+_HR_FACTOR = _hr_factor(_HRS)
+_HR_FACTOR.setflags(write=False)
+
+# SVR-only afterload and elastance factors tabulated over the slider grid
+_SVR_GRID = np.arange(500, 2010, 10)
+_AFTERLOAD = np.exp(-0.0003 * (_SVR_GRID - 800))
+_EES_FACTOR = np.exp(-0.0002 * (_SVR_GRID - 800))
+
+def _svr_factors(svr):
+    """Return the (afterload, elastance) factors for an SVR value"""
+    # Look up the SVR factors, falling back to direct evaluation off the grid
+    idx = int(round((svr - 500) / 10))
+    if 0 <= idx < len(_SVR_GRID) and _SVR_GRID[idx] == svr:
+        return _AFTERLOAD[idx], _EES_FACTOR[idx]
+    return np.exp(-0.0003 * (svr - 800)), np.exp(-0.0002 * (svr - 800))
+
+def _model_constants(ef, svr):
+    """
+    Heart-rate-independent terms, computed once per EF/SVR pair
+    
+    Returns (afterload factor, Ees, EF/SVR-adjusted wedge reference).
+    """
+    afterload, ees_factor = _svr_factors(svr)
+    ees = 2.0 * ef / 0.55 * ees_factor
+    
+    # Ejection Fraction Sensitivity
+    # Lower EF suggests reduced ventricular compliance and different filling requirements
+    ef_factor = 1 - ef  # Ranges from 0 (high EF) to 1 (low EF)
+    
+    # Systemic Vascular Resistance Impact
+    # Higher SVR suggests increased afterload and different filling pressure needs
+    svr_factor = (svr / 800 - 1)  # Normalized SVR deviation
+    
+    # Wedge pressure reference adjusted for EF and SVR
+    wedge_base = (
+        12  # Central reference point
+        * (1 - 0.4 * ef_factor)  # EF adjustment (more significant impact)
+        * (1 + 0.3 * svr_factor)  # SVR adjustment
+    )
+    
+    return afterload, ees, wedge_base
+
+def _stroke_volume(hr, ef, afterload):
+    """Stroke volume from EDV, reduced by shorter filling time and higher afterload"""
+    base_edv = 150
+    filling_effect = np.exp(-0.25 * np.maximum(0, (hr - 60)/60))
+    edv = base_edv * filling_effect * afterload
+    return edv * ef
+
+def _arterial_load(hr, sv, svr):
+    """Return (CO, MAP, Ea) for a stroke volume"""
+    co = (sv * hr) / 1000
+    map_pressure = (co * svr) / 80
+    ea = (map_pressure * 0.9) / sv
+    return co, map_pressure, ea
+
+def _optimal_wedge(hr_factor, wedge_base):
+    """
+    Optimal wedge pressure from the EF/SVR-adjusted reference
+    
+    Key Principles from Sepsis Hemodynamic Research:
+    - Filling pressure is dynamically linked to multiple physiological parameters
+    - Optimal pressure varies with cardiac function, heart rate, and vascular resistance
+    - Considers both global and regional perfusion dynamics
+    """
+    optimal_wedge = wedge_base * (1 + 0.2 * hr_factor)  # Heart rate adjustment
+    
+    # Physiological Constraints
+    # Ensure wedge pressure remains in a clinically reasonable range
+    return np.clip(optimal_wedge, 5.0, 25.0)
+
+def _curve(hr, ef, svr, constants, diastolic_efficiency, hr_factor):
+    """
+    Evaluate the model for an array (or scalar) of heart rates
+    
+    The EF/SVR-only terms come in precomputed as ``constants`` (see
+    _model_constants), as do the HR-only diastolic efficiency and wedge
+    heart rate factor, so only the remaining HR-dependent work happens here.
+    
+    Returns (efficiency, coupling ratio, SV, CO, optimal wedge pressure).
+    """
+    afterload, ees, wedge_base = constants
+    
+    sv = _stroke_volume(hr, ef, afterload)
+    co, map_pressure, ea = _arterial_load(hr, sv, svr)
+    
+    # Calculate coupling ratio
+    coupling_ratio = ea/ees
+    
+    optimal_wedge = _optimal_wedge(hr_factor, wedge_base)
+    
+    # Mechanical efficiency calculation
+    mechanical_efficiency = np.exp(-((coupling_ratio - 0.8)/0.4)**2)
+    
+    # Final efficiency
+    efficiency = mechanical_efficiency * diastolic_efficiency * 100
+    
+    return efficiency, coupling_ratio, sv, co, optimal_wedge
+
+class VACouplingApp:
+    def __init__(self, ef, svr):
+        self.ef = ef
+        self.svr = svr
+        self._constants = _model_constants(ef, svr)
+
+    def _constants_for(self, svr, ef):
+        """EF/SVR-only terms for the given pair, reusing the instance's when they match"""
+        if svr == self.svr and ef == self.ef:
+            return self._constants
+        return _model_constants(ef, svr)
+
+    def calculate_sv(self, hr, svr, ef):
+        afterload, _, _ = self._constants_for(svr, ef)
+        return _stroke_volume(hr, ef, afterload)
+
+    def calculate_elastances(self, hr, svr, ef):
+        afterload, ees, _ = self._constants_for(svr, ef)
+        sv = _stroke_volume(hr, ef, afterload)
+        _, map_pressure, ea = _arterial_load(hr, sv, svr)
+        return ea, ees, sv, map_pressure
+
+    def calculate_optimal_wedge_pressure(self, hr, svr, ef):
+        """
+        Dynamically calculate optimal wedge pressure based on complex physiological interactions
+        
+        See _optimal_wedge for the underlying principles.
+        """
+        _, _, wedge_base = self._constants_for(svr, ef)
+        return _optimal_wedge(_hr_factor(hr), wedge_base)
+
+    def calculate_efficiency(self, hr, svr, ef):
+        return _curve(
+            hr, ef, svr, self._constants_for(svr, ef),
+            _diastolic_efficiency(hr), _hr_factor(hr)
+        )
+
+    def generate_data(self):
+        return _columns(sweep_curve(self.ef, self.svr))
+
+@functools.lru_cache(maxsize=1024)
+def sweep_curve(ef: float, svr: float) -> np.ndarray:
+    """
+    Memoized sweep over the fixed heart rate grid
+    
+    Entry point for scripts, notebooks and tests that call the model
+    outside a Streamlit session, and the layer beneath the app's
+    st.cache_data wrapper. Returns a (5, n) array whose rows are the
+    efficiency, coupling ratio, SV, CO and optimal wedge pressure columns,
+    each contiguous in memory; it is shared between callers and therefore
+    read-only.
+    """
+    out = np.stack(_curve(
+        _HRS, ef, svr, _model_constants(ef, svr), _DIAS_EFF, _HR_FACTOR
+    ))
+    out.setflags(write=False)
+    return out
+
+def _columns(out):
+    """Split a sweep into named column arrays; Plotly consumes these directly"""
+    return {
+        'hr': _HRS,
+        'efficiency': out[0],
+        'coupling_ratio': out[1],
+        'sv': out[2],
+        'co': out[3],
+        'optimal_wedge': out[4]
+    }